@@ -246,8 +246,15 @@ def test_system() -> dict[str, Any]:
     venv_python = PROJECT_ROOT / "venv" / "bin" / "python3"
     transcribe_script = PROJECT_ROOT / "scripts" / "transcribe.py"
 
-    # Check if test audio exists
-    test_audio = list((PROJECT_ROOT.parent / "VoiceNotes").glob("*.m4a"))
+    # Check if test audio exists (use the most recent recording)
+    recordings = []
+    for path in (PROJECT_ROOT.parent / "VoiceNotes").glob("*.m4a"):
+        try:
+            recordings.append((path.stat().st_mtime, path))
+        except OSError:
+            # Deleted or moved since the glob
+            continue
+    test_audio = [path for _, path in sorted(recordings, reverse=True)]
 
     if test_audio:
         result = run_command([
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Compare transcription backends on local audio files.
+
+Runs every selected backend from transcribe.py over the same recordings and
+reports model load time, transcription time, real-time factor (processing
+time / audio duration, lower is faster) and word error rate against a
+reference. The reference is the first backend's transcript unless a text
+file with the same name as the recording (recording.txt next to
+recording.m4a) exists.
+
+Everything runs on the local machine; use --offline to make sure no model
+is downloaded during the run.
+
+Usage:
+    python benchmark_transcribe.py <audio_file> [<audio_file> ...] [--model base]
+    python benchmark_transcribe.py ~/Documents/VoiceNotes/*.m4a --backends whisper faster-whisper --json
+
+Example:
+    python benchmark_transcribe.py recording.m4a --model small --offline
+"""
+
+import sys
+import argparse
+import json
+import re
+import subprocess
+import time
+from pathlib import Path
+from typing import Optional
+
+from transcribe import BACKENDS, get_backend
+
+
+def word_error_rate(hypothesis: str, reference: str) -> float:
+    """
+    Word error rate of hypothesis against reference (case and punctuation
+    insensitive).
+    """
+    hyp = re.findall(r"[a-z0-9']+", hypothesis.lower())
+    ref = re.findall(r"[a-z0-9']+", reference.lower())
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+
+    return previous[-1] / len(ref)
+
+
+def audio_duration(audio_file: Path) -> Optional[float]:
+    """
+    Length of a recording in seconds, read with ffprobe (installed with ffmpeg).
+
+    Measured from the file itself rather than from transcript segments, which
+    differ between backends (faster-whisper's VAD trims silence).
+    """
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+             "-of", "default=noprint_wrappers=1:nokey=1", str(audio_file)],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        return float(result.stdout.strip()) if result.returncode == 0 else None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+def benchmark_backend(name: str, audio_files: list[Path], durations: list[Optional[float]],
+                      model_name: str, model_dir: Optional[str] = None,
+                      offline: bool = False) -> dict:
+    """
+    Transcribe every file with one backend and time it.
+
+    Args:
+        name: Backend name (see transcribe.BACKENDS)
+        audio_files: Recordings to transcribe
+        durations: Audio length of each file in seconds (None if unknown),
+            shared by all backends so their real-time factors are comparable
+        model_name: Whisper model size
+        model_dir: Optional model cache directory
+        offline: Only use locally cached models
+
+    Returns:
+        Dictionary with the load time and one entry per file
+    """
+    backend = get_backend(name, model_name, model_dir=model_dir, offline=offline)
+
+    start = time.perf_counter()
+    backend.load()
+    load_s = time.perf_counter() - start
+
+    files = []
+    for audio_file, duration in zip(audio_files, durations):
+        start = time.perf_counter()
+        result = backend.transcribe(str(audio_file))
+        elapsed = time.perf_counter() - start
+
+        files.append({
+            "file": str(audio_file),
+            "text": result["text"],
+            "seconds": round(elapsed, 2),
+            "audio_seconds": round(duration, 2) if duration else None,
+            "real_time_factor": round(elapsed / duration, 3) if duration else None
+        })
+
+    return {"backend": name, "model": model_name, "load_seconds": round(load_s, 2), "files": files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription backends")
+    parser.add_argument("audio_files", nargs="+", type=Path, help="Recordings to transcribe")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS),
+                       help="Backends to compare; the first is the reference (default: all)")
+    parser.add_argument("--model", default="base",
+                       choices=["tiny", "base", "small", "medium", "large"],
+                       help="Whisper model size (default: base)")
+    parser.add_argument("--model-dir",
+                       help="Directory to load/cache model files from")
+    parser.add_argument("--offline", action="store_true",
+                       help="Only use locally cached models")
+    parser.add_argument("--json", action="store_true",
+                       help="Output full results as JSON")
+
+    args = parser.parse_args()
+
+    missing = [str(f) for f in args.audio_files if not f.exists()]
+    if missing:
+        print(f"Error: Audio file(s) not found: {', '.join(missing)}", file=sys.stderr)
+        sys.exit(1)
+
+    durations = [audio_duration(f) for f in args.audio_files]
+    unknown = [str(f) for f, d in zip(args.audio_files, durations) if not d]
+    if unknown:
+        print(f"Warning: could not read duration (is ffprobe installed?): {', '.join(unknown)}",
+              file=sys.stderr)
+
+    results = []
+    for name in args.backends:
+        try:
+            results.append(benchmark_backend(name, args.audio_files, durations, args.model,
+                                             args.model_dir, args.offline))
+        except Exception as e:
+            print(f"Error benchmarking {name}: {e}", file=sys.stderr)
+            results.append({"backend": name, "model": args.model, "error": str(e), "files": []})
+
+    # Reference transcripts: a matching .txt file, else the first backend
+    reference_backend = next((r for r in results if r["files"]), None)
+    for index, audio_file in enumerate(args.audio_files):
+        reference_path = audio_file.with_suffix(".txt")
+        if reference_path.exists():
+            reference = reference_path.read_text()
+        elif reference_backend is not None:
+            reference = reference_backend["files"][index]["text"]
+        else:
+            continue
+        for result in results:
+            if result["files"]:
+                entry = result["files"][index]
+                entry["wer"] = round(word_error_rate(entry["text"], reference), 3)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'backend':<16} {'load s':>7} {'total s':>8} {'audio s':>8} {'RTF':>6} {'WER':>6}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['backend']:<16} error: {result['error']}")
+            continue
+        total = sum(f["seconds"] for f in result["files"])
+        # RTF only over files whose duration is known
+        timed = [f for f in result["files"] if f["audio_seconds"]]
+        audio = sum(f["audio_seconds"] for f in timed)
+        wers = [f["wer"] for f in result["files"] if "wer" in f]
+        rtf = f"{sum(f['seconds'] for f in timed) / audio:.3f}" if audio else "-"
+        wer = f"{sum(wers) / len(wers):.3f}" if wers else "-"
+        print(f"{result['backend']:<16} {result['load_seconds']:>7.2f} {total:>8.2f} {audio:>8.2f} {rtf:>6} {wer:>6}")
+
+
+if __name__ == "__main__":
+    main()
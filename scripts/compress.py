@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Shrink voice-note transcripts before they are sent to the LLM.
+
+Transcripts from Whisper are full of fillers ("um", "you know"), stutters
+("I had had had") and false starts. All of it costs prompt tokens without
+helping the summary. This script runs entirely locally and in two steps:
+
+    1. Disfluency removal: drops filler words, collapses repeated words and
+       phrases, and removes cut-off words ("sto- store").
+    2. Extractive ranking: scores sentences with TextRank (PageRank over a
+       word-overlap similarity graph) and keeps the best ones, in their
+       original order, until the token budget is used up.
+
+summarize.py uses this as an optional pre-stage (--compress-budget).
+
+Usage:
+    python compress.py "text to compress" [--budget 200]
+    python compress.py --file transcript.txt [--budget 200] [--json]
+    cat transcript.txt | python compress.py --file - [--budget 200]
+    python compress.py --evaluate fixtures/transcripts.ndjson [--budget 60] [--model qwen2.5:7b-instruct]
+    python compress.py --check
+
+Evaluation mode summarizes every fixture twice, once from the full transcript
+and once from the compressed one. It reports the compression ratio, the
+measured model latency saved, and how far the compressed summary drifts from
+the full one (unigram F1 between the two summaries and recall of each
+fixture's "key_points"). A throwaway warm-up call runs first so the model
+load is not counted as latency saved. --check runs the offline regression
+cases for disfluency removal.
+
+Example:
+    python compress.py "Um, so I had had had a great day, you know, at the gym." --json
+"""
+
+import sys
+import argparse
+import json
+import math
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+
+# Sentence-opening fillers that never carry meaning
+OPENING_FILLERS = r"(?:so|well|you know|i mean)"
+# Openers that can carry meaning ("Right, turn left."); only removed when
+# another filler follows them ("Okay, so, we ship Friday.")
+OPENING_MAYBE_FILLERS = r"(?:okay|ok|right)"
+
+# (pattern, replacement) pairs, applied repeatedly until the text is stable
+FILLER_PATTERNS = [
+    # Hesitation sounds. Case-sensitive and limited to forms that are never
+    # units or acronyms ("mm", "ER", "AH" must survive); only the first
+    # letter may be capitalized, as at the start of a sentence. The commas
+    # around the sound go with it ("the, uh, contractor").
+    (re.compile(r"(?:,\s*)?\b(?:[Uu]h+|[Uu]m+|[Hh]mm+|[Ee]rm)\b,?"), " "),
+    # Discourse fillers, only when set off by commas on both sides to avoid
+    # removing real uses ("I like it", "do you know him"). One comma stays
+    # so appositives keep their punctuation ("The MM team, the materials
+    # people, will..."); the tidy-up step removes it where it is redundant.
+    (re.compile(r",\s*(?:you know|i mean|like|sort of|kind of|basically|actually)\s*,",
+                re.IGNORECASE), ", "),
+    (re.compile(rf"(?:^|(?<=[.!?]))\s*(?:{OPENING_MAYBE_FILLERS}\s*,\s*)*{OPENING_FILLERS}\s*,",
+                re.IGNORECASE), " "),
+]
+
+# Offline regression cases for remove_disfluencies(); run with --check
+DISFLUENCY_CASES = [
+    ("The bolt is 5 mm wide.", "The bolt is 5 mm wide."),
+    ("I was in the ER, um, yesterday.", "I was in the ER yesterday."),
+    ("The MM team met.", "The MM team met."),
+    ("Right, turn left.", "Right, turn left."),
+    ("Okay, the meeting is at 3.", "Okay, the meeting is at 3."),
+    ("Use a 10- to 12-foot board.", "Use a 10- to 12-foot board."),
+    ("Pre- and post-op checks.", "Pre- and post-op checks."),
+    ("I went to the sto- store.", "I went to the store."),
+    ("The MM team, you know, the materials management people, will order it.",
+     "The MM team, the materials management people, will order it."),
+    ("Okay, I mean, so, we ship Friday.", "We ship Friday."),
+    ("Well, I mean, yes.", "Yes."),
+    ("It's, like, still leaking.", "It's, still leaking."),
+    ("Um, so I think I think we need milk.", "So I think we need milk."),
+    ("I had had had an injury.", "I had had an injury."),
+    ("If we, if we push it.", "If we push it."),
+]
+
+# Words that can legitimately appear twice in a row ("I had had enough",
+# "I know that that works"); longer runs of them are still collapsed.
+LEGITIMATE_DOUBLES = {"had", "that"}
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "but", "if", "so", "of", "to", "in", "on",
+    "at", "by", "for", "with", "from", "up", "about", "into", "over", "after",
+    "is", "am", "are", "was", "were", "be", "been", "being", "have", "has",
+    "had", "do", "does", "did", "i", "me", "my", "we", "our", "you", "your",
+    "he", "him", "his", "she", "her", "it", "its", "they", "them", "their",
+    "this", "that", "these", "those", "just", "also", "then", "than", "there",
+    "what", "which", "who", "when", "where", "how", "not", "no", "yes", "yeah",
+    "as", "too", "very", "really", "all", "some", "any", "can", "will",
+    "would", "could", "should", "i'm", "i'd", "i'll", "i've", "it's",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of LLM tokens in text.
+
+    Counts words and punctuation marks, which tracks the tokenizers of the
+    supported models closely enough for budgeting.
+    """
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def remove_disfluencies(text: str) -> str:
+    """
+    Remove fillers, stutters and false starts from a transcript.
+
+    Args:
+        text: Raw transcript text
+
+    Returns:
+        Cleaned transcript text
+    """
+    # Repeat until stable so stacked fillers ("Well, okay, ...") all go
+    previous = None
+    while previous != text:
+        previous = text
+        for pattern, replacement in FILLER_PATTERNS:
+            text = pattern.sub(replacement, text)
+
+    # Cut-off words: "I went to the sto- store". Numbers and suspended
+    # hyphens ("10- to 12-foot", "pre- and post-op") are left alone.
+    text = re.sub(r"\b(?!\d)\w+-\s+(?!(?:to|or|and)\b)(?=\w)", "", text)
+
+    # Repeated two-word phrases: "I think I think", "if we, if we"
+    text = re.sub(r"\b([\w']+\s+[\w']+)(?:,?\s+\1\b)+", r"\1", text, flags=re.IGNORECASE)
+
+    # Repeated single words: "the the", "who, who", "had had had"
+    def collapse(match: re.Match) -> str:
+        word = match.group(1)
+        if word.lower() in LEGITIMATE_DOUBLES:
+            return f"{word} {word}"
+        return word
+
+    text = re.sub(r"\b([\w']+)(?:,?\s+\1\b)+", collapse, text, flags=re.IGNORECASE)
+
+    # Tidy up whitespace and punctuation left behind
+    text = re.sub(r"\s+([,.!?])", r"\1", text)
+    text = re.sub(r",\s*(?=[,.!?])", "", text)
+    text = re.sub(r"(^|[.!?]\s+),\s*", r"\1", text)
+    text = re.sub(r"\s{2,}", " ", text).strip()
+
+    # Re-capitalize sentences whose first word was a filler
+    return re.sub(r"(^|[.!?]\s+)([a-z])", lambda m: m.group(1) + m.group(2).upper(), text)
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences on terminal punctuation."""
+    return [s.strip() for s in re.split(r"(?<=[.!?])\s+", text) if s.strip()]
+
+
+def _content_words(sentence: str) -> set[str]:
+    words = re.findall(r"[a-z0-9']+", sentence.lower())
+    return {w for w in words if w not in STOPWORDS}
+
+
+def rank_sentences(sentences: list[str], damping: float = 0.85,
+                   iterations: int = 50, tolerance: float = 1e-6) -> list[float]:
+    """
+    Score sentences with TextRank.
+
+    Sentences are nodes; edge weights are the word-overlap similarity from
+    the original TextRank paper: |common words| / (log|S1| + log|S2|).
+
+    Args:
+        sentences: Sentences to score
+        damping: PageRank damping factor
+        iterations: Maximum power-iteration steps
+        tolerance: Stop once no score moves by more than this
+
+    Returns:
+        One score per sentence (higher is more central)
+    """
+    count = len(sentences)
+    if count == 0:
+        return []
+
+    words = [_content_words(s) for s in sentences]
+    weights = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(i + 1, count):
+            overlap = len(words[i] & words[j])
+            if not overlap:
+                continue
+            norm = math.log(len(words[i]) + 1) + math.log(len(words[j]) + 1)
+            weights[i][j] = weights[j][i] = overlap / norm
+
+    out_weight = [sum(row) for row in weights]
+    scores = [1.0] * count
+    for _ in range(iterations):
+        new_scores = []
+        for i in range(count):
+            incoming = sum(
+                weights[j][i] / out_weight[j] * scores[j]
+                for j in range(count)
+                if weights[j][i] and out_weight[j]
+            )
+            new_scores.append((1 - damping) + damping * incoming)
+        converged = max(abs(a - b) for a, b in zip(new_scores, scores)) < tolerance
+        scores = new_scores
+        if converged:
+            break
+
+    return scores
+
+
+def compress_transcript(text: str, token_budget: Optional[int] = None) -> dict:
+    """
+    Clean a transcript and cut it down to a token budget.
+
+    Args:
+        text: Raw transcript text
+        token_budget: Maximum estimated tokens to keep, or None to only
+            remove disfluencies
+
+    Returns:
+        Dictionary with the compressed "text" and its statistics
+    """
+    start = time.perf_counter()
+
+    cleaned = remove_disfluencies(text)
+    compressed = cleaned
+    dropped = 0
+
+    if token_budget is not None and estimate_tokens(cleaned) > token_budget:
+        sentences = split_sentences(cleaned)
+        scores = rank_sentences(sentences)
+        ranked = sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True)
+
+        keep = set()
+        used = 0
+        for i in ranked:
+            cost = estimate_tokens(sentences[i])
+            if used + cost <= token_budget:
+                keep.add(i)
+                used += cost
+
+        # Never send an empty prompt; fall back to the top-ranked sentence
+        if not keep and ranked:
+            keep.add(ranked[0])
+
+        compressed = " ".join(sentences[i] for i in sorted(keep))
+        dropped = len(sentences) - len(keep)
+
+    original_tokens = estimate_tokens(text)
+    compressed_tokens = estimate_tokens(compressed)
+
+    return {
+        "text": compressed,
+        "original_tokens": original_tokens,
+        "compressed_tokens": compressed_tokens,
+        "compression_ratio": round(compressed_tokens / original_tokens, 3) if original_tokens else 1.0,
+        "dropped_sentences": dropped,
+        "compress_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+def _unigram_f1(a: str, b: str) -> float:
+    a_words = re.findall(r"[a-z0-9']+", a.lower())
+    b_words = re.findall(r"[a-z0-9']+", b.lower())
+    if not a_words or not b_words:
+        return 0.0
+    remaining = list(b_words)
+    overlap = 0
+    for word in a_words:
+        if word in remaining:
+            remaining.remove(word)
+            overlap += 1
+    if not overlap:
+        return 0.0
+    precision = overlap / len(a_words)
+    recall = overlap / len(b_words)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _key_point_recall(summary: str, key_points: list[str]) -> Optional[float]:
+    if not key_points:
+        return None
+    lowered = summary.lower()
+    return sum(1 for point in key_points if point.lower() in lowered) / len(key_points)
+
+
+def evaluate_fixtures(fixtures_path: Path, token_budget: int,
+                      model: str = "qwen2.5:7b-instruct") -> list[dict]:
+    """
+    Measure compression savings and summary drift on a fixture set.
+
+    Each fixture line is a JSON object with "id", "text" and an optional
+    list of "key_points" that a good summary should mention.
+
+    Args:
+        fixtures_path: NDJSON file of fixtures
+        token_budget: Token budget passed to compress_transcript()
+        model: Ollama model used for both summaries
+
+    Returns:
+        One result dictionary per fixture
+    """
+    # Imported here because summarize.py imports this module
+    from summarize import summarize_text
+
+    # Throwaway call so the model load is not billed to the first fixture
+    summarize_text("Warm-up note.", model)
+
+    results = []
+    for line in fixtures_path.read_text().splitlines():
+        if not line.strip():
+            continue
+        fixture = json.loads(line)
+        key_points = fixture.get("key_points", [])
+        compression = compress_transcript(fixture["text"], token_budget)
+
+        # The cache is bypassed so both latencies are real model calls
+        start = time.perf_counter()
+        full_summary = summarize_text(fixture["text"], model)
+        full_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        compressed_summary = summarize_text(compression["text"], model)
+        compressed_ms = (time.perf_counter() - start) * 1000 + compression["compress_ms"]
+
+        results.append({
+            "id": fixture.get("id"),
+            "original_tokens": compression["original_tokens"],
+            "compressed_tokens": compression["compressed_tokens"],
+            "compression_ratio": compression["compression_ratio"],
+            "dropped_sentences": compression["dropped_sentences"],
+            "full_ms": round(full_ms, 1),
+            "compressed_ms": round(compressed_ms, 1),
+            "latency_saved_ms": round(full_ms - compressed_ms, 1),
+            "summary_f1": round(_unigram_f1(compressed_summary, full_summary), 3),
+            "key_point_recall_full": _key_point_recall(full_summary, key_points),
+            "key_point_recall_compressed": _key_point_recall(compressed_summary, key_points)
+        })
+
+    return results
+
+
+def check_disfluencies() -> list[str]:
+    """
+    Run remove_disfluencies() over DISFLUENCY_CASES.
+
+    Returns:
+        Failure descriptions (empty when every case passes)
+    """
+    failures = []
+    for text, expected in DISFLUENCY_CASES:
+        actual = remove_disfluencies(text)
+        if actual != expected:
+            failures.append(f"{text!r}: expected {expected!r}, got {actual!r}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress transcripts before summarization")
+    parser.add_argument("input", nargs="?", help="Text to compress")
+    parser.add_argument("--file", metavar="FILE",
+                       help="Read the transcript from FILE ('-' for stdin) instead of the argument")
+    parser.add_argument("--budget", type=int, default=None,
+                       help="Token budget for the compressed text (default: only remove disfluencies)")
+    parser.add_argument("--json", action="store_true",
+                       help="Output text and statistics as JSON")
+    parser.add_argument("--evaluate", type=Path, metavar="FIXTURES",
+                       help="Measure compression and summary drift on an NDJSON fixture set")
+    parser.add_argument("--model", default="qwen2.5:7b-instruct",
+                       help="Ollama model for --evaluate (default: qwen2.5:7b-instruct)")
+    parser.add_argument("--check", action="store_true",
+                       help="Run the offline disfluency-removal checks and exit")
+
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check_disfluencies()
+        for failure in failures:
+            print(f"FAIL {failure}", file=sys.stderr)
+        print(f"{len(DISFLUENCY_CASES) - len(failures)}/{len(DISFLUENCY_CASES)} disfluency checks passed",
+              file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+    if args.evaluate:
+        # Below every fixture's size, so sentence ranking is exercised too
+        budget = args.budget if args.budget is not None else 60
+        try:
+            results = evaluate_fixtures(args.evaluate, budget, args.model)
+        except Exception as e:
+            print(f"Error during evaluation: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        for result in results:
+            print(json.dumps(result))
+
+        if results:
+            count = len(results)
+            print(
+                f"{count} fixture(s): "
+                f"mean ratio {sum(r['compression_ratio'] for r in results) / count:.2f}, "
+                f"mean latency saved {sum(r['latency_saved_ms'] for r in results) / count:.0f} ms, "
+                f"mean summary F1 {sum(r['summary_f1'] for r in results) / count:.2f}",
+                file=sys.stderr
+            )
+        return
+
+    if (args.input is None) == (args.file is None):
+        parser.error("give either text or --file (unless --evaluate or --check is used)")
+
+    if args.file == "-":
+        text = sys.stdin.read()
+    elif args.file:
+        try:
+            text = Path(args.file).read_text()
+        except OSError as e:
+            print(f"Error reading {args.file}: {e}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        text = args.input
+
+    result = compress_transcript(text, args.budget)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(result["text"])
+
+
+if __name__ == "__main__":
+    main()
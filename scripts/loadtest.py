@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Load-test the transcribe -> summarize processing path.
+
+Replays a corpus of audio files at a configurable arrival pattern (for
+example a burst of notes arriving together when the phone reconnects to WiFi)
+through a two-stage pipeline with separate worker limits for transcription and
+summarization. It reports per-stage queue wait, service time and end-to-end
+latency percentiles, which helps choose concurrency limits. Time a summary
+spends queued inside Ollama for a free slot is reported as ollama_wait, not
+as summarize service time.
+
+By default both stages are stand-ins, so the test runs offline:
+    - Whisper is replaced by a stub backend that sleeps for a configurable
+      time per note. With --whisper-rtf the time is the recording's length
+      (read with ffprobe) times that real-time factor, so long notes cost
+      more than short ones; --whisper-latency is the fallback for files
+      whose length cannot be read.
+    - Ollama is replaced by a local HTTP server that implements /api/chat.
+      It handles --ollama-parallel requests at a time, like OLLAMA_NUM_PARALLEL.
+      The real summarize_text() and call_ollama() code talks to it.
+
+Use --real to run the actual transcription backend and the running Ollama.
+
+Usage:
+    python loadtest.py <audio_file_or_folder> [...] [--notes 12] [--pattern burst]
+    python loadtest.py ~/Documents/VoiceNotes --pattern poisson --rate 0.5 --notes 50 --json
+
+Example:
+    # 12 notes at once, 2 transcription workers, Ollama serving one request at a time
+    python loadtest.py ~/Documents/VoiceNotes --notes 12 --pattern burst \\
+        --transcribe-workers 2 --summarize-workers 2 --whisper-rtf 0.3 --ollama-latency 2
+"""
+
+import sys
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+
+import summarize
+from benchmark_transcribe import audio_duration
+from transcribe import BACKENDS, TranscriptionBackend, get_backend
+from watch import AUDIO_EXTENSIONS
+
+
+def sample_latency(rng: random.Random, mean: float, jitter: float) -> float:
+    """Draw a service time around mean with relative standard deviation jitter."""
+    return max(0.0, rng.gauss(mean, mean * jitter))
+
+
+class StubTranscriptionBackend(TranscriptionBackend):
+    """
+    Stand-in for Whisper that sleeps instead of decoding audio.
+
+    With a real-time factor, each file takes its duration times rtf;
+    files with unknown duration (or no rtf) take the fixed latency.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency: float = 3.0, jitter: float = 0.2, seed: int = 0,
+                 rtf: Optional[float] = None, durations: Optional[dict[str, float]] = None,
+                 **options):
+        super().__init__(**options)
+        self.latency = latency
+        self.jitter = jitter
+        self.rtf = rtf
+        self.durations = durations or {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def load(self) -> None:
+        self.model = "stub"
+
+    def stream_segments(self, audio_path: str):
+        mean = self.latency
+        duration = self.durations.get(audio_path)
+        if self.rtf is not None and duration:
+            mean = duration * self.rtf
+        with self.lock:
+            delay = sample_latency(self.rng, mean, self.jitter)
+        time.sleep(delay)
+        text = f"Stub transcript of {Path(audio_path).name}. Pick up milk and call the plumber."
+        return "en", iter([{"start": 0.0, "end": delay, "text": text}])
+
+
+class StubOllamaServer:
+    """
+    Local HTTP server that answers Ollama /api/chat requests after a delay.
+
+    Only `parallel` requests are served at a time; the rest wait, as they do
+    on a real Ollama server. Like Ollama, the response reports the time spent
+    generating as total_duration (nanoseconds); the time spent waiting for a
+    slot is reported separately as queue_duration.
+    """
+
+    def __init__(self, latency: float = 2.0, jitter: float = 0.2, parallel: int = 1, seed: int = 0):
+        rng = random.Random(seed)
+        lock = threading.Lock()
+        slots = threading.Semaphore(parallel)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                with lock:
+                    delay = sample_latency(rng, latency, jitter)
+                queued = time.perf_counter()
+                with slots:
+                    started = time.perf_counter()
+                    time.sleep(delay)
+                    finished = time.perf_counter()
+
+                body = json.dumps({
+                    "model": request.get("model"),
+                    "message": {"role": "assistant", "content": "- Stub summary"},
+                    "done": True,
+                    "total_duration": int((finished - started) * 1e9),
+                    "queue_duration": int((started - queued) * 1e9)
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self) -> "StubOllamaServer":
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def arrival_offsets(count: int, pattern: str, rate: float, rng: random.Random) -> list[float]:
+    """
+    Arrival times in seconds from the start of the run.
+
+    Args:
+        count: Number of notes
+        pattern: "burst" (all at once), "uniform" (every 1/rate seconds) or
+            "poisson" (exponential gaps with mean 1/rate)
+        rate: Notes per second for uniform and poisson
+        rng: Random source for poisson gaps
+
+    Returns:
+        Sorted list of offsets
+    """
+    if pattern == "burst":
+        return [0.0] * count
+    if pattern == "uniform":
+        return [i / rate for i in range(count)]
+
+    offsets = []
+    now = 0.0
+    for _ in range(count):
+        offsets.append(now)
+        now += rng.expovariate(rate)
+    return offsets
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def run_load(audio_files: list[Path], notes: int, offsets: list[float], backend: TranscriptionBackend,
+             summary_model: str, transcribe_workers: int, summarize_workers: int) -> list[dict]:
+    """
+    Push notes through the pipeline and time every stage.
+
+    Returns:
+        One timing record per note; times are seconds from the start of the run
+    """
+    records = []
+    done = threading.Event()
+    remaining = [notes]
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def clock() -> float:
+        return time.perf_counter() - start
+
+    transcribe_pool = ThreadPoolExecutor(max_workers=transcribe_workers)
+    summarize_pool = ThreadPoolExecutor(max_workers=summarize_workers)
+
+    def finish(record: dict) -> None:
+        with lock:
+            records.append(record)
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                done.set()
+
+    def summarize_stage(record: dict, text: str) -> None:
+        record["summarize_start"] = clock()
+        stats = {}
+        try:
+            summarize.summarize_text(text, summary_model, stats=stats)
+        except Exception as e:
+            record["error"] = f"summarize: {e}"
+        record["summarize_end"] = clock()
+
+        # Split the call into time waiting inside Ollama for a free slot and
+        # time actually generating. Real Ollama has no queue field, so its
+        # wait is whatever the call took beyond total_duration.
+        elapsed = record["summarize_end"] - record["summarize_start"]
+        service = stats.get("total_duration", elapsed * 1e9) / 1e9
+        if "queue_duration" in stats:
+            record["ollama_wait"] = stats["queue_duration"] / 1e9
+        else:
+            record["ollama_wait"] = max(0.0, elapsed - service)
+        record["ollama_service"] = service
+        finish(record)
+
+    def transcribe_stage(record: dict) -> None:
+        record["transcribe_start"] = clock()
+        try:
+            text = backend.transcribe(record["file"])["text"]
+        except Exception as e:
+            record["error"] = f"transcribe: {e}"
+            record["transcribe_end"] = record["summarize_start"] = record["summarize_end"] = clock()
+            record["ollama_wait"] = record["ollama_service"] = 0.0
+            finish(record)
+            return
+        record["transcribe_end"] = clock()
+        summarize_pool.submit(summarize_stage, record, text)
+
+    for index, offset in enumerate(offsets):
+        delay = offset - clock()
+        if delay > 0:
+            time.sleep(delay)
+        record = {"note": index, "file": str(audio_files[index % len(audio_files)]),
+                  "arrival": clock(), "error": None}
+        transcribe_pool.submit(transcribe_stage, record)
+
+    done.wait()
+    transcribe_pool.shutdown()
+    summarize_pool.shutdown()
+
+    return sorted(records, key=lambda r: r["note"])
+
+
+def summarize_timings(records: list[dict]) -> dict:
+    """Aggregate per-note timings into p50/p95/p99 statistics."""
+    metrics = {
+        "transcribe_wait": [r["transcribe_start"] - r["arrival"] for r in records],
+        "transcribe_service": [r["transcribe_end"] - r["transcribe_start"] for r in records],
+        "summarize_wait": [r["summarize_start"] - r["transcribe_end"] for r in records],
+        "ollama_wait": [r["ollama_wait"] for r in records],
+        "summarize_service": [r["ollama_service"] for r in records],
+        "end_to_end": [r["summarize_end"] - r["arrival"] for r in records],
+    }
+
+    report = {
+        name: {
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "max": round(max(values, default=0.0), 3)
+        }
+        for name, values in metrics.items()
+    }
+
+    duration = max((r["summarize_end"] for r in records), default=0.0)
+    report["notes"] = len(records)
+    report["errors"] = sum(1 for r in records if r["error"])
+    report["duration_s"] = round(duration, 3)
+    report["throughput_per_min"] = round(len(records) / duration * 60, 2) if duration else 0.0
+    return report
+
+
+def collect_audio_files(inputs: list[Path]) -> list[Path]:
+    """Expand folders into the audio files they contain."""
+    files = []
+    for path in inputs:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in AUDIO_EXTENSIONS))
+        elif path.exists():
+            files.append(path)
+    return files
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the transcribe/summarize path")
+    parser.add_argument("corpus", nargs="+", type=Path, help="Audio files or folders to replay")
+    parser.add_argument("--notes", type=int, default=12,
+                       help="Number of notes to send, cycling through the corpus (default: 12)")
+    parser.add_argument("--pattern", default="burst", choices=["burst", "uniform", "poisson"],
+                       help="Arrival pattern (default: burst)")
+    parser.add_argument("--rate", type=float, default=1.0,
+                       help="Arrivals per second for uniform/poisson (default: 1)")
+    parser.add_argument("--transcribe-workers", type=int, default=1,
+                       help="Concurrent transcriptions (default: 1)")
+    parser.add_argument("--summarize-workers", type=int, default=1,
+                       help="Concurrent summaries (default: 1)")
+    parser.add_argument("--whisper-latency", type=float, default=3.0,
+                       help="Mean stub transcription time in seconds, or the fallback for "
+                            "--whisper-rtf when a file's length is unknown (default: 3)")
+    parser.add_argument("--whisper-rtf", type=float,
+                       help="Stub transcription time as a fraction of each recording's length, "
+                            "e.g. 0.3 (needs ffprobe)")
+    parser.add_argument("--ollama-latency", type=float, default=2.0,
+                       help="Mean stub summary time in seconds (default: 2)")
+    parser.add_argument("--ollama-parallel", type=int, default=1,
+                       help="Requests the stub Ollama serves at once (default: 1)")
+    parser.add_argument("--jitter", type=float, default=0.2,
+                       help="Relative standard deviation of stub latencies (default: 0.2)")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Random seed for arrivals and stub latencies (default: 0)")
+    parser.add_argument("--real", action="store_true",
+                       help="Use the real transcription backend and Ollama instead of stubs")
+    parser.add_argument("--backend", default="whisper", choices=list(BACKENDS),
+                       help="Transcription engine for --real (default: whisper)")
+    parser.add_argument("--model", default="base",
+                       choices=["tiny", "base", "small", "medium", "large"],
+                       help="Whisper model size for --real (default: base)")
+    parser.add_argument("--summary-model", default="qwen2.5:7b-instruct",
+                       help="Ollama model (default: qwen2.5:7b-instruct)")
+    parser.add_argument("--json", action="store_true",
+                       help="Output the report and per-note timings as JSON")
+
+    args = parser.parse_args()
+
+    if args.notes < 1 or args.transcribe_workers < 1 or args.summarize_workers < 1 or args.ollama_parallel < 1:
+        parser.error("--notes, worker counts and --ollama-parallel must be at least 1")
+    if args.pattern != "burst" and args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    audio_files = collect_audio_files(args.corpus)
+    if not audio_files:
+        print("Error: No audio files found in corpus", file=sys.stderr)
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    offsets = arrival_offsets(args.notes, args.pattern, args.rate, rng)
+
+    def execute(backend: TranscriptionBackend) -> list[dict]:
+        return run_load(audio_files, args.notes, offsets, backend, args.summary_model,
+                        args.transcribe_workers, args.summarize_workers)
+
+    if args.real:
+        backend = get_backend(args.backend, args.model)
+        backend.load()
+        records = execute(backend)
+    else:
+        durations = {}
+        if args.whisper_rtf is not None:
+            durations = {str(f): audio_duration(f) for f in audio_files}
+            unknown = [path for path, duration in durations.items() if not duration]
+            if unknown:
+                print(f"Warning: could not read duration of {len(unknown)} file(s) "
+                      f"(is ffprobe installed?); "
+                      f"using --whisper-latency {args.whisper_latency:g}s for them", file=sys.stderr)
+        backend = StubTranscriptionBackend(args.whisper_latency, args.jitter, args.seed,
+                                           args.whisper_rtf, durations)
+        with StubOllamaServer(args.ollama_latency, args.jitter, args.ollama_parallel, args.seed) as server:
+            summarize.OLLAMA_URL = server.url
+            records = execute(backend)
+
+    report = summarize_timings(records)
+
+    if args.json:
+        print(json.dumps({"report": report, "notes": records}, indent=2))
+        return
+
+    print(f"{report['notes']} notes ({args.pattern}), {report['errors']} errors, "
+          f"{report['duration_s']:.1f}s total, {report['throughput_per_min']:.1f} notes/min")
+    print(f"{'seconds':<20} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for name in ["transcribe_wait", "transcribe_service", "summarize_wait", "ollama_wait",
+                 "summarize_service", "end_to_end"]:
+        stats = report[name]
+        print(f"{name:<20} {stats['p50']:>8.2f} {stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}")
+
+    for record in records:
+        if record["error"]:
+            print(f"note {record['note']}: {record['error']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ Ollama LLM service (no internet required).
 Usage:
     python summarize.py "text to summarize" [--model qwen2.5:7b-instruct]
     python summarize.py transcript.txt [--model qwen2.5:7b-instruct]
+    python summarize.py --batch notes.ndjson [--concurrency 2] [--order input]
+    cat notes.ndjson | python summarize.py --batch - [--order completion]
 
 Models (must be downloaded first with 'ollama pull'):
     - qwen2.5:7b-instruct - Best quality summaries (default, recommended)
@@ -16,9 +18,40 @@ Models (must be downloaded first with 'ollama pull'):
     - gemma2:latest       - Faster, lighter weight
     - mistral:latest      - Older option, less concise
 
+Batch mode (NDJSON):
+    Each input line is a JSON object with a "text" field and an optional "id"
+    (a bare JSON string is also accepted as the text). One result object is
+    written per input line:
+
+        {"index": 0, "id": "note-1", "model": "...", "summary": "...",
+         "latency_ms": 1234.5, "error": null}
+
+    Records are summarized by a bounded pool of workers (--concurrency), and
+    results are written in input order (default) or as each one completes.
+    Failed records keep their slot with "summary": null and an "error" string.
+
 Example:
     python summarize.py "Today I went to the store and bought milk..." --model qwen2.5:7b-instruct
 
+Caching:
+    The fixed instructions are sent as a stable system message so Ollama can
+    reuse the evaluated prompt prefix across notes. Summaries are generated
+    with deterministic sampling and cached on disk (LRU, keyed by model,
+    prompt version and text, transcript hash and sampling options), so
+    resending the same transcript is answered without calling the model. Use
+    --no-cache to bypass the cache, or set VOICE_NOTES_CACHE to move it.
+
+    The prefix is only reused while the model stays loaded. Ollama's own
+    keep-alive setting applies unless --keep-alive (or VOICE_NOTES_KEEP_ALIVE)
+    asks for a different duration, e.g. --keep-alive 30m.
+
+Compression:
+    --compress runs compress.py's local pre-stage first: fillers and
+    stutters are removed and the transcript is cut to --compress-budget
+    tokens with TextRank. The compression ratio is reported on stderr (and
+    in the JSON/NDJSON output). See compress.py --evaluate for measuring
+    latency saved and summary drift on the fixture set.
+
 Prerequisites:
     - Ollama installed via Homebrew: brew install ollama
     - Ollama service running: brew services start ollama
@@ -27,84 +60,458 @@ Prerequisites:
 
 import sys
 import argparse
+import contextlib
+import hashlib
 import json
-import subprocess
+import os
+import sqlite3
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Iterator, Optional, TextIO
+
+from compress import compress_transcript
 
 
-def call_ollama(prompt: str, model: str = "qwen2.5:7b-instruct") -> str:
+def ollama_url(host: Optional[str]) -> str:
+    """
+    Normalize an OLLAMA_HOST value into a base URL.
+
+    Like the Ollama client, a missing scheme means http, a missing host
+    means 127.0.0.1 and a missing port means 11434, or 443 for https
+    ("localhost" -> "http://localhost:11434").
+    """
+    host = (host or "").strip()
+    if "://" not in host:
+        host = f"http://{host}"
+    parts = urllib.parse.urlsplit(host)
+    hostname = parts.hostname or "127.0.0.1"
+    if ":" in hostname:
+        hostname = f"[{hostname}]"
+    port = parts.port or (443 if parts.scheme == "https" else 11434)
+    return f"{parts.scheme}://{hostname}:{port}{parts.path.rstrip('/')}"
+
+
+OLLAMA_URL = ollama_url(os.environ.get("OLLAMA_HOST"))
+
+# How long Ollama keeps the model loaded after a request (e.g. "10m", "-1").
+# None leaves it to the server's own setting (5 minutes unless configured).
+KEEP_ALIVE = os.environ.get("VOICE_NOTES_KEEP_ALIVE") or None
+
+# Cache keys also include a hash of SYSTEM_PROMPT and USER_PROMPT_TEMPLATE,
+# so editing either invalidates old summaries automatically. Bump this for
+# changes that affect output without touching the prompt text.
+PROMPT_VERSION = "1"
+
+# The instructions are identical for every note. Sending them as a fixed
+# system message keeps the start of the conversation byte-for-byte stable,
+# so Ollama can reuse the already-evaluated prefix while the model stays loaded.
+SYSTEM_PROMPT = """You are a helpful assistant that summarizes voice notes into clear, concise bullet points.
+
+Given a transcribed voice note, create a summary using bullet points. Focus on:
+- Key ideas and main points
+- Action items (if any)
+- Important details or decisions
+
+Keep it brief and well-organized. Output the bullet points only."""
+
+USER_PROMPT_TEMPLATE = """Voice note transcription:
+{text}
+
+Summary (bullet points only):"""
+
+# Greedy, seeded decoding so the same transcript always yields the same
+# summary, which is what makes cached responses valid.
+SAMPLING_OPTIONS = {"temperature": 0, "top_k": 1, "seed": 42}
+
+DEFAULT_CACHE_PATH = Path(os.environ.get(
+    "VOICE_NOTES_CACHE",
+    Path.home() / ".cache" / "voice-notes" / "summaries.sqlite3"
+))
+
+
+class ResponseCache:
+    """
+    Persistent LRU cache of model responses backed by SQLite.
+
+    Entries are keyed by (model, prompt version, transcript hash, sampling
+    options). Each lookup opens its own connection, so a single cache can be
+    shared by the batch-mode worker threads.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_entries: int = 1000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+
+    def _connect(self) -> contextlib.closing:
+        # closing() releases the connection; the inner `with conn` commits
+        return contextlib.closing(sqlite3.connect(self.path, timeout=30))
+
+    @staticmethod
+    def make_key(model: str, text: str, options: dict) -> str:
+        """Build the cache key for a transcript and its generation settings."""
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        prompt_hash = hashlib.sha256(
+            (SYSTEM_PROMPT + "\0" + USER_PROMPT_TEMPLATE).encode("utf-8")
+        ).hexdigest()
+        material = json.dumps([model, PROMPT_VERSION, prompt_hash, text_hash, options], sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, marking it as recently used."""
+        with self._connect() as conn, conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response and evict the least recently used overflow."""
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, last_used) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN ("
+                " SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+
+def call_ollama(prompt: str, model: str = "qwen2.5:7b-instruct",
+                system: Optional[str] = None, options: Optional[dict] = None,
+                stats: Optional[dict] = None) -> str:
     """
     Call Ollama API to generate summary.
 
     Args:
-        prompt: The full prompt to send to the model
+        prompt: The user message to send to the model
         model: Ollama model to use
+        system: Optional system message placed before the user message
+        options: Optional Ollama generation options (temperature, seed, ...)
+        stats: Optional dictionary that receives the server's timing fields
+            (total_duration, eval_duration, ... in nanoseconds)
 
     Returns:
         Generated text response
     """
-    try:
-        # Use the Ollama CLI directly (Homebrew installation)
-        result = subprocess.run(
-            ["/opt/homebrew/bin/ollama", "run", model],
-            input=prompt,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    request_body = {
+        "model": model,
+        "messages": messages,
+        "options": options or {},
+        "stream": False
+    }
+    if KEEP_ALIVE is not None:
+        # A longer keep-alive keeps the model and its cached prompt prefix
+        # resident between notes, at the cost of memory
+        request_body["keep_alive"] = KEEP_ALIVE
+    payload = json.dumps(request_body).encode("utf-8")
+
+    request = urllib.request.Request(
+        f"{OLLAMA_URL}/api/chat",
+        data=payload,
+        headers={"Content-Type": "application/json"}
+    )
 
-        if result.returncode != 0:
-            raise RuntimeError(f"Ollama error: {result.stderr}")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            body = json.load(response)
+    except urllib.error.HTTPError as e:
+        raise RuntimeError(f"Ollama error: {e.read().decode('utf-8', 'replace')}")
+    except TimeoutError:
+        raise RuntimeError("Ollama request timed out")
+    except urllib.error.URLError as e:
+        raise RuntimeError(f"Could not reach Ollama at {OLLAMA_URL}. Is it running? ({e.reason})")
 
-        return result.stdout.strip()
+    if stats is not None:
+        stats.update({k: v for k, v in body.items() if k.endswith("_duration") or k.endswith("_count")})
 
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("Ollama request timed out")
-    except FileNotFoundError:
-        raise RuntimeError("Ollama not found. Is it installed?")
+    return body["message"]["content"].strip()
 
 
-def summarize_text(text: str, model: str = "qwen2.5:7b-instruct") -> str:
+def summarize_text(text: str, model: str = "qwen2.5:7b-instruct",
+                   cache: Optional[ResponseCache] = None,
+                   stats: Optional[dict] = None) -> str:
     """
     Summarize text into concise bullet points.
 
     Args:
         text: Text to summarize
         model: Ollama model to use
+        cache: Optional response cache consulted before calling the model
+        stats: Optional dictionary that receives Ollama's timing fields
+            (left empty on a cache hit)
 
     Returns:
         Summarized text in bullet points
     """
-    prompt = f"""You are a helpful assistant that summarizes voice notes into clear, concise bullet points.
+    key = None
+    if cache is not None:
+        key = cache.make_key(model, text, SAMPLING_OPTIONS)
+        try:
+            cached = cache.get(key)
+        except sqlite3.Error as e:
+            print(f"Warning: response cache lookup failed ({e})", file=sys.stderr)
+            cached = None
+        if cached is not None:
+            print(f"Using cached summary for {model}", file=sys.stderr)
+            return cached
 
-Given the following transcribed voice note, create a summary using bullet points. Focus on:
-- Key ideas and main points
-- Action items (if any)
-- Important details or decisions
+    prompt = USER_PROMPT_TEMPLATE.format(text=text)
 
-Keep it brief and well-organized.
+    print(f"Generating summary with {model}...", file=sys.stderr)
+    summary = call_ollama(prompt, model, system=SYSTEM_PROMPT, options=SAMPLING_OPTIONS, stats=stats)
 
-Voice note transcription:
-{text}
+    if cache is not None and summary:
+        # The cache is best-effort; never lose a generated summary over it
+        try:
+            cache.put(key, summary)
+        except sqlite3.Error as e:
+            print(f"Warning: could not cache summary ({e})", file=sys.stderr)
 
-Summary (bullet points only):"""
+    return summary
 
-    print(f"Generating summary with {model}...", file=sys.stderr)
-    summary = call_ollama(prompt, model)
 
-    return summary
+def read_ndjson_records(stream: TextIO) -> Iterator[dict]:
+    """
+    Parse NDJSON transcript records from a stream.
+
+    Blank lines are skipped. Lines that cannot be parsed are still yielded
+    (with an "error") so the output keeps one result per input record.
+
+    Args:
+        stream: Text stream with one JSON record per line
+
+    Yields:
+        Dictionaries with "index", "id", "text" and "error" keys
+    """
+    index = 0
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+
+        record = {"index": index, "id": None, "text": None, "error": None}
+        try:
+            data = json.loads(line)
+            if isinstance(data, str):
+                record["text"] = data
+            elif isinstance(data, dict):
+                # Keep the id even when the record is invalid so callers can
+                # match the error to their input
+                record["id"] = data.get("id")
+                if isinstance(data.get("text"), str):
+                    record["text"] = data["text"]
+                else:
+                    record["error"] = f"line {line_number}: expected a string or an object with a \"text\" field"
+            else:
+                record["error"] = f"line {line_number}: expected a string or an object with a \"text\" field"
+        except json.JSONDecodeError as e:
+            record["error"] = f"line {line_number}: invalid JSON ({e})"
+
+        yield record
+        index += 1
+
+
+def summarize_record(record: dict, model: str, cache: Optional[ResponseCache] = None,
+                     compress_budget: Optional[int] = None) -> dict:
+    """
+    Summarize a single NDJSON record, capturing latency and any error.
+
+    Args:
+        record: Record produced by read_ndjson_records()
+        model: Ollama model to use
+        cache: Optional response cache
+        compress_budget: Token budget for transcript pre-compression, or
+            None to send the transcript unchanged
+
+    Returns:
+        Result dictionary ready to be written as one NDJSON line
+    """
+    result = {
+        "index": record["index"],
+        "id": record["id"],
+        "model": model,
+        "summary": None,
+        "latency_ms": 0.0,
+        "error": record["error"]
+    }
+    if result["error"]:
+        return result
+
+    if not record["text"].strip():
+        result["error"] = "No text provided"
+        return result
+
+    start = time.perf_counter()
+    try:
+        text = record["text"]
+        if compress_budget is not None:
+            compression = compress_transcript(text, compress_budget)
+            text = compression.pop("text")
+            result["compression"] = compression
+        result["summary"] = summarize_text(text, model, cache)
+    except Exception as e:
+        result["error"] = str(e)
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    return result
+
+
+def summarize_batch(stream: TextIO, output: TextIO, model: str = "qwen2.5:7b-instruct",
+                    concurrency: int = 2, order: str = "input",
+                    cache: Optional[ResponseCache] = None,
+                    compress_budget: Optional[int] = None) -> int:
+    """
+    Summarize NDJSON transcripts with a bounded number of concurrent model calls.
+
+    Args:
+        stream: NDJSON input (see read_ndjson_records)
+        output: Stream to write NDJSON results to
+        model: Ollama model to use
+        concurrency: Maximum number of in-flight summaries
+        order: "input" to write results in input order, "completion" to
+            write each result as soon as it finishes
+        cache: Optional response cache shared by all workers
+        compress_budget: Token budget for transcript pre-compression, or None
+
+    Returns:
+        Number of records that failed
+    """
+    failures = 0
+
+    def emit(result: dict) -> None:
+        nonlocal failures
+        if result["error"]:
+            failures += 1
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+
+    records = read_ndjson_records(stream)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Keep a small window of records in flight so large inputs are
+        # streamed rather than loaded up front. In input order, results held
+        # back behind a slow record count against the window too.
+        pending = {}
+        finished = {}
+        next_index = 0
+        exhausted = False
+
+        while pending or not exhausted:
+            while not exhausted and len(pending) + len(finished) < concurrency * 2:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                    break
+                future = pool.submit(summarize_record, record, model, cache, compress_budget)
+                pending[future] = record["index"]
+
+            if not pending:
+                break
+
+            done = next(as_completed(pending))
+            del pending[done]
+            result = done.result()
+
+            if order == "completion":
+                emit(result)
+                continue
+
+            finished[result["index"]] = result
+            while next_index in finished:
+                emit(finished.pop(next_index))
+                next_index += 1
+
+    return failures
 
 
 def main():
+    global KEEP_ALIVE
+
     parser = argparse.ArgumentParser(description="Summarize text using Ollama")
-    parser.add_argument("input", help="Text to summarize or path to text file")
+    parser.add_argument("input", nargs="?", help="Text to summarize or path to text file")
     parser.add_argument("--model", default="qwen2.5:7b-instruct",
                        help="Ollama model to use (default: qwen2.5:7b-instruct)")
     parser.add_argument("--json", action="store_true",
                        help="Output as JSON")
+    parser.add_argument("--batch", metavar="FILE",
+                       help="Summarize NDJSON records from FILE ('-' for stdin) and write NDJSON results")
+    parser.add_argument("--concurrency", type=int, default=2,
+                       help="Maximum concurrent summaries in batch mode (default: 2)")
+    parser.add_argument("--order", default="input", choices=["input", "completion"],
+                       help="Batch output order (default: input)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always call the model instead of reusing cached summaries")
+    parser.add_argument("--cache-path", type=Path, default=DEFAULT_CACHE_PATH,
+                       help=f"Response cache location (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--cache-size", type=int, default=1000,
+                       help="Maximum cached summaries before LRU eviction (default: 1000)")
+    parser.add_argument("--keep-alive", default=KEEP_ALIVE,
+                       help="How long Ollama keeps the model loaded, e.g. 30m (default: server setting)")
+    parser.add_argument("--compress", action="store_true",
+                       help="Remove fillers and trim the transcript to --compress-budget before summarizing")
+    parser.add_argument("--compress-budget", type=int, default=400,
+                       help="Token budget for --compress (default: 400)")
 
     args = parser.parse_args()
 
+    KEEP_ALIVE = args.keep_alive
+
+    compress_budget = args.compress_budget if args.compress else None
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ResponseCache(args.cache_path, args.cache_size)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: response cache disabled ({e})", file=sys.stderr)
+
+    if args.batch:
+        if args.input:
+            parser.error("--batch cannot be combined with a positional input")
+        if args.concurrency < 1:
+            parser.error("--concurrency must be at least 1")
+
+        try:
+            if args.batch == "-":
+                failures = summarize_batch(sys.stdin, sys.stdout, args.model,
+                                           args.concurrency, args.order, cache,
+                                           compress_budget)
+            else:
+                with open(args.batch) as stream:
+                    failures = summarize_batch(stream, sys.stdout, args.model,
+                                               args.concurrency, args.order, cache,
+                                               compress_budget)
+        except OSError as e:
+            print(f"Error reading batch input: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        if failures:
+            print(f"{failures} record(s) failed", file=sys.stderr)
+            sys.exit(2)
+        return
+
+    if args.input is None:
+        parser.error("input is required unless --batch is given")
+
     # Check if input is a file or direct text
     # Only check for file if input looks like a reasonable path
     if len(args.input) < 500 and not args.input.startswith('\n'):
@@ -123,8 +530,20 @@ def main():
         print("Error: No text provided", file=sys.stderr)
         sys.exit(1)
 
+    compression = None
+    prompt_text = text
+    if compress_budget is not None:
+        compression = compress_transcript(text, compress_budget)
+        prompt_text = compression.pop("text")
+        print(
+            f"Compressed transcript: {compression['original_tokens']} -> "
+            f"{compression['compressed_tokens']} tokens "
+            f"(ratio {compression['compression_ratio']}) in {compression['compress_ms']} ms",
+            file=sys.stderr
+        )
+
     try:
-        summary = summarize_text(text, args.model)
+        summary = summarize_text(prompt_text, args.model, cache)
 
         if args.json:
             output = {
@@ -132,6 +551,8 @@ def main():
                 "summary": summary,
                 "model": args.model
             }
+            if compression is not None:
+                output["compression"] = compression
             print(json.dumps(output, indent=2))
         else:
             print(summary)
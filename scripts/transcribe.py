@@ -3,10 +3,11 @@
 Transcribe audio files using OpenAI Whisper.
 
 This script is called by the Mac server to convert voice recordings to text.
-It uses the locally-installed Whisper model (no internet required).
+It uses a locally-installed Whisper model (no internet required).
 
 Usage:
-    python transcribe.py <audio_file> [--model base]
+    python transcribe.py <audio_file> [--model base] [--backend whisper]
+    python transcribe.py <audio_file> --stream
 
 Models (in order of speed vs accuracy):
     - tiny:   Fastest, least accurate
@@ -15,46 +16,220 @@ Models (in order of speed vs accuracy):
     - medium: High accuracy, much slower
     - large:  Best accuracy, very slow
 
+Backends:
+    - whisper:        openai-whisper on PyTorch (default)
+    - faster-whisper: CTranslate2 with int8 weights; several times faster on
+                      CPU-only machines (pip install faster-whisper)
+
+Both backends produce the same result schema. Models are cached locally
+after the first download; pass --offline to fail instead of reaching the
+network for a missing model, and --model-dir to use a specific cache.
+benchmark_transcribe.py compares the backends on your own recordings.
+
 Example:
     python transcribe.py recording.m4a --model base
+    python transcribe.py recording.m4a --backend faster-whisper --offline
 """
 
 import sys
-import whisper
 import argparse
 import json
+import os
+from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Iterator, Optional
+
+
+def make_segment(start: float, end: float, text: str) -> dict:
+    """Build a segment dictionary in the result schema."""
+    return {
+        "start": start,
+        "end": end,
+        "text": text.strip()
+    }
 
 
-def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
+class TranscriptionBackend(ABC):
+    """
+    Interface for speech-to-text engines.
+
+    Subclasses implement load() and stream_segments(); transcribe() builds
+    the result dictionary that the Mac server and other scripts rely on.
+    """
+
+    name = ""
+
+    def __init__(self, model_name: str = "base", model_dir: Optional[str] = None,
+                 offline: bool = False):
+        self.model_name = model_name
+        self.model_dir = model_dir
+        self.offline = offline
+        self.model = None
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load the model into memory (called lazily on first use)."""
+
+    @abstractmethod
+    def stream_segments(self, audio_path: str) -> tuple[str, Iterator[dict]]:
+        """
+        Transcribe an audio file segment by segment.
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Tuple of (detected language, iterator of segment dictionaries with
+            "start", "end" and "text" keys)
+        """
+
+    def transcribe(self, audio_path: str) -> dict:
+        """
+        Transcribe an audio file.
+
+        Args:
+            audio_path: Path to the audio file
+
+        Returns:
+            Dictionary containing transcription and metadata
+        """
+        language, segments = self.stream_segments(audio_path)
+        segments = list(segments)
+
+        return {
+            "text": " ".join(seg["text"] for seg in segments if seg["text"]).strip(),
+            "language": language or "unknown",
+            "segments": segments
+        }
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper running in fp32 on PyTorch."""
+
+    name = "whisper"
+
+    def load(self) -> None:
+        import whisper
+
+        if self.offline:
+            # load_model() silently downloads missing checkpoints, so check
+            # the cache ourselves (same default location as openai-whisper)
+            model_dir = self.model_dir or os.path.join(
+                os.getenv("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                "whisper"
+            )
+            url = whisper._MODELS.get(self.model_name)
+            if url is not None and not os.path.isfile(os.path.join(model_dir, os.path.basename(url))):
+                raise RuntimeError(
+                    f"Whisper model '{self.model_name}' is not cached in {model_dir} "
+                    "and --offline forbids downloading it"
+                )
+
+        print(f"Loading Whisper model '{self.model_name}'...", file=sys.stderr)
+        self.model = whisper.load_model(self.model_name, download_root=self.model_dir)
+
+    def _run(self, audio_path: str) -> dict:
+        if self.model is None:
+            self.load()
+
+        print(f"Transcribing {audio_path}...", file=sys.stderr)
+        # fp16 is unsupported on CPU and only produces a warning there
+        return self.model.transcribe(audio_path, fp16=self.model.device.type != "cpu")
+
+    @staticmethod
+    def _segments(result: dict) -> Iterator[dict]:
+        return (
+            make_segment(seg["start"], seg["end"], seg["text"])
+            for seg in result.get("segments", [])
+        )
+
+    def stream_segments(self, audio_path: str) -> tuple[str, Iterator[dict]]:
+        # openai-whisper only returns once the whole file is decoded
+        result = self._run(audio_path)
+        return result.get("language", "unknown"), self._segments(result)
+
+    def transcribe(self, audio_path: str) -> dict:
+        # Overridden to keep Whisper's own full-text joining
+        result = self._run(audio_path)
+
+        return {
+            "text": result["text"].strip(),
+            "language": result.get("language", "unknown"),
+            "segments": list(self._segments(result))
+        }
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2) with int8-quantized weights on the CPU."""
+
+    name = "faster-whisper"
+
+    # openai-whisper's "large" is an alias for the latest large checkpoint
+    MODEL_ALIASES = {"large": "large-v3"}
+
+    def load(self) -> None:
+        from faster_whisper import WhisperModel
+
+        model_name = self.MODEL_ALIASES.get(self.model_name, self.model_name)
+        print(f"Loading faster-whisper model '{model_name}' (int8)...", file=sys.stderr)
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type="int8",
+            cpu_threads=os.cpu_count() or 0,
+            download_root=self.model_dir,
+            local_files_only=self.offline
+        )
+
+    def stream_segments(self, audio_path: str) -> tuple[str, Iterator[dict]]:
+        if self.model is None:
+            self.load()
+
+        print(f"Transcribing {audio_path}...", file=sys.stderr)
+        # Segments are decoded lazily as the iterator is consumed
+        segments, info = self.model.transcribe(audio_path, beam_size=5, vad_filter=True)
+        stream = (make_segment(seg.start, seg.end, seg.text) for seg in segments)
+        return info.language, stream
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def get_backend(name: str = "whisper", model_name: str = "base", **options) -> TranscriptionBackend:
+    """
+    Create a transcription backend by name.
+
+    Args:
+        name: Backend name (see BACKENDS)
+        model_name: Whisper model size (tiny, base, small, medium, large)
+        **options: Passed to the backend (model_dir, offline)
+
+    Returns:
+        Backend instance; the model is loaded on first use
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}' (choose from: {', '.join(BACKENDS)})")
+    return BACKENDS[name](model_name, **options)
+
+
+def transcribe_audio(audio_path: str, model_name: str = "base", backend: str = "whisper",
+                     **options) -> dict:
     """
     Transcribe an audio file using Whisper.
 
     Args:
         audio_path: Path to the audio file
         model_name: Whisper model to use (tiny, base, small, medium, large)
+        backend: Transcription backend to use (whisper, faster-whisper)
+        **options: Passed to the backend (model_dir, offline)
 
     Returns:
         Dictionary containing transcription and metadata
     """
-    print(f"Loading Whisper model '{model_name}'...", file=sys.stderr)
-    model = whisper.load_model(model_name)
-
-    print(f"Transcribing {audio_path}...", file=sys.stderr)
-    result = model.transcribe(audio_path)
-
-    return {
-        "text": result["text"].strip(),
-        "language": result.get("language", "unknown"),
-        "segments": [
-            {
-                "start": seg["start"],
-                "end": seg["end"],
-                "text": seg["text"].strip()
-            }
-            for seg in result.get("segments", [])
-        ]
-    }
+    return get_backend(backend, model_name, **options).transcribe(audio_path)
 
 
 def main():
@@ -63,8 +238,16 @@ def main():
     parser.add_argument("--model", default="base",
                        choices=["tiny", "base", "small", "medium", "large"],
                        help="Whisper model size (default: base)")
+    parser.add_argument("--backend", default="whisper", choices=list(BACKENDS),
+                       help="Transcription engine (default: whisper)")
+    parser.add_argument("--model-dir",
+                       help="Directory to load/cache model files from")
+    parser.add_argument("--offline", action="store_true",
+                       help="Only use locally cached models; fail instead of downloading")
     parser.add_argument("--json", action="store_true",
                        help="Output as JSON instead of plain text")
+    parser.add_argument("--stream", action="store_true",
+                       help="Print each segment as an NDJSON line as soon as it is decoded")
 
     args = parser.parse_args()
 
@@ -74,7 +257,16 @@ def main():
         sys.exit(1)
 
     try:
-        result = transcribe_audio(str(audio_path), args.model)
+        backend = get_backend(args.backend, args.model,
+                              model_dir=args.model_dir, offline=args.offline)
+
+        if args.stream:
+            _, segments = backend.stream_segments(str(audio_path))
+            for segment in segments:
+                print(json.dumps(segment), flush=True)
+            return
+
+        result = backend.transcribe(str(audio_path))
 
         if args.json:
             print(json.dumps(result, indent=2))
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Watch the VoiceNotes storage folder and process new recordings.
+
+Any audio file that appears or changes in the folder is transcribed and
+summarized once it has finished being written. Processed files are recorded
+in a manifest (path, size, mtime, content hash -> results), so restarts and
+re-scans skip notes that were already handled. A file that was only touched,
+or copied/renamed, is matched by content hash and not processed again.
+
+File-system events come from the optional `watchdog` package (inotify on
+Linux, FSEvents on macOS). Without it the folder is polled instead. Either
+way a file is only picked up once its size and mtime have stopped changing
+for --settle seconds.
+
+Usage:
+    python watch.py [<folder>] [--model small] [--backend whisper]
+    python watch.py ~/Documents/VoiceNotes --once
+
+Each processed note is printed as one NDJSON line:
+
+    {"path": "...", "text": "...", "language": "en", "summary": "...",
+     "processed_at": 1700000000.0}
+
+Example:
+    python watch.py --backend faster-whisper --summary-model qwen2.5:7b-instruct
+
+Prerequisites:
+    - Same as transcribe.py and summarize.py
+    - Optional: pip install watchdog (event-driven instead of polling)
+"""
+
+import sys
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from summarize import DEFAULT_CACHE_PATH, ResponseCache, summarize_text
+from compress import compress_transcript
+from transcribe import BACKENDS, get_backend
+
+
+AUDIO_EXTENSIONS = {".m4a", ".wav", ".mp3", ".aac", ".caf"}
+
+DEFAULT_FOLDER = Path.home() / "Documents" / "VoiceNotes"
+
+MANIFEST_NAME = ".voice-notes-manifest.json"
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Record of processed audio files, stored as JSON next to the recordings.
+
+    Entries map a file path to its size, mtime, content hash and results.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text())
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Warning: ignoring unreadable manifest {path} ({e})", file=sys.stderr)
+
+    def lookup(self, audio_path: Path, stat: os.stat_result) -> tuple[Optional[dict], Optional[str]]:
+        """
+        Find existing results for a file.
+
+        Unchanged size and mtime are trusted without hashing. Otherwise the
+        file is hashed and matched against every known entry, which covers
+        files that were touched, renamed or copied.
+
+        Returns:
+            Tuple of (results or None if the file needs processing, content
+            hash if one was computed)
+        """
+        key = str(audio_path)
+        entry = self.entries.get(key)
+        if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry["result"], None
+
+        digest = file_hash(audio_path)
+        for other in self.entries.values():
+            if other["sha256"] == digest:
+                self.record(audio_path, stat, digest, other["result"])
+                return other["result"], digest
+
+        return None, digest
+
+    def record(self, audio_path: Path, stat: os.stat_result, digest: str, result: dict) -> None:
+        """Store results for a file and save the manifest."""
+        self.entries[str(audio_path)] = {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": digest,
+            "result": result
+        }
+        self.save()
+
+    def save(self) -> None:
+        # Write to a temporary file first so a crash never leaves a truncated manifest
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.entries, indent=2))
+        os.replace(tmp_path, self.path)
+
+
+class FolderWatcher:
+    """
+    Find audio files in a folder that are complete and not yet processed.
+
+    scan() is cheap and safe to call repeatedly; files are reported as ready
+    once their size and mtime are unchanged across two scans and the last
+    write is at least `settle` seconds old.
+    """
+
+    def __init__(self, folder: Path, manifest: Manifest, settle: float = 2.0):
+        self.folder = folder
+        self.manifest = manifest
+        self.settle = settle
+        self.observed: dict[Path, tuple[int, float]] = {}
+        self.failed: set[tuple[Path, int, float]] = set()
+        self.wake = threading.Event()
+
+    def start_events(self) -> bool:
+        """
+        Subscribe to file-system events so scans run as soon as files change.
+
+        Returns:
+            True if event notifications are active, False to rely on polling
+        """
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher.wake.set()
+
+        observer = Observer()
+        observer.schedule(Handler(), str(self.folder), recursive=False)
+        observer.daemon = True
+        observer.start()
+        return True
+
+    def scan(self) -> tuple[list[tuple[Path, os.stat_result, str]], int]:
+        """
+        Look for files that need processing.
+
+        Returns:
+            Tuple of (ready files as (path, stat, content hash), number still
+            being written)
+        """
+        ready = []
+        waiting = 0
+        now = time.time()
+        seen = set()
+
+        for path in sorted(self.folder.iterdir()):
+            if path.name.startswith(".") or path.suffix.lower() not in AUDIO_EXTENSIONS:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+
+            seen.add(path)
+            signature = (stat.st_size, stat.st_mtime)
+            previous = self.observed.get(path)
+            self.observed[path] = signature
+
+            if (path, *signature) in self.failed:
+                continue
+            if previous != signature or now - stat.st_mtime < self.settle:
+                waiting += 1
+                continue
+            try:
+                result, digest = self.manifest.lookup(path, stat)
+            except OSError as e:
+                print(f"Error reading {path}: {e}", file=sys.stderr)
+                self.failed.add((path, *signature))
+                continue
+            if result is not None:
+                continue
+            ready.append((path, stat, digest))
+
+        for path in set(self.observed) - seen:
+            del self.observed[path]
+
+        return ready, waiting
+
+
+def process_file(path: Path, backend, summary_model: str,
+                 cache: Optional[ResponseCache] = None,
+                 compress_budget: Optional[int] = None) -> dict:
+    """
+    Transcribe and summarize one recording.
+
+    Args:
+        path: Audio file
+        backend: Transcription backend from transcribe.get_backend()
+        summary_model: Ollama model for the summary
+        cache: Optional summary response cache
+        compress_budget: Optional token budget for transcript compression
+
+    Returns:
+        Result dictionary stored in the manifest
+    """
+    transcription = backend.transcribe(str(path))
+
+    text = transcription["text"]
+    if compress_budget is not None:
+        text = compress_transcript(text, compress_budget)["text"]
+    summary = summarize_text(text, summary_model, cache) if text.strip() else ""
+
+    return {
+        "path": str(path),
+        "text": transcription["text"],
+        "language": transcription["language"],
+        "summary": summary,
+        "processed_at": time.time()
+    }
+
+
+def run(watcher: FolderWatcher, backend, summary_model: str, interval: float = 5.0,
+        once: bool = False, cache: Optional[ResponseCache] = None,
+        compress_budget: Optional[int] = None) -> None:
+    """
+    Process ready files until interrupted (or, with once=True, until the
+    folder has no unprocessed files left).
+    """
+    while True:
+        watcher.wake.clear()
+        ready, waiting = watcher.scan()
+
+        for path, stat, digest in ready:
+            try:
+                result = process_file(path, backend, summary_model, cache, compress_budget)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"Error processing {path}: {e}", file=sys.stderr)
+                # Don't retry until the file changes
+                watcher.failed.add((path, stat.st_size, stat.st_mtime))
+                continue
+
+            try:
+                watcher.manifest.record(path, stat, digest, result)
+            except OSError as e:
+                # The entry is still kept in memory, so this run won't
+                # reprocess the file; only a restart would
+                print(f"Error saving manifest {watcher.manifest.path}: {e}", file=sys.stderr)
+            print(json.dumps(result), flush=True)
+
+        if once and not waiting:
+            return
+
+        # Re-scan sooner while files are settling; otherwise wait for an
+        # event or the next poll
+        watcher.wake.wait(min(interval, watcher.settle) if waiting else interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a folder and process new voice notes")
+    parser.add_argument("folder", nargs="?", type=Path, default=DEFAULT_FOLDER,
+                       help=f"Folder to watch (default: {DEFAULT_FOLDER})")
+    parser.add_argument("--model", default="small",
+                       choices=["tiny", "base", "small", "medium", "large"],
+                       help="Whisper model size (default: small)")
+    parser.add_argument("--backend", default="whisper", choices=list(BACKENDS),
+                       help="Transcription engine (default: whisper)")
+    parser.add_argument("--summary-model", default="qwen2.5:7b-instruct",
+                       help="Ollama model for summaries (default: qwen2.5:7b-instruct)")
+    parser.add_argument("--manifest", type=Path,
+                       help=f"Manifest location (default: <folder>/{MANIFEST_NAME})")
+    parser.add_argument("--settle", type=float, default=2.0,
+                       help="Seconds a file must stay unchanged before processing (default: 2)")
+    parser.add_argument("--interval", type=float, default=5.0,
+                       help="Polling interval in seconds (default: 5)")
+    parser.add_argument("--once", action="store_true",
+                       help="Process everything currently in the folder, then exit")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always call the model instead of reusing cached summaries")
+    parser.add_argument("--cache-path", type=Path, default=DEFAULT_CACHE_PATH,
+                       help=f"Response cache location (default: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--compress", action="store_true",
+                       help="Compress transcripts before summarizing (see compress.py)")
+    parser.add_argument("--compress-budget", type=int, default=400,
+                       help="Token budget for --compress (default: 400)")
+
+    args = parser.parse_args()
+
+    if not args.folder.is_dir():
+        print(f"Error: Folder not found: {args.folder}", file=sys.stderr)
+        sys.exit(1)
+
+    manifest = Manifest(args.manifest or args.folder / MANIFEST_NAME)
+    watcher = FolderWatcher(args.folder, manifest, args.settle)
+    backend = get_backend(args.backend, args.model)
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = ResponseCache(args.cache_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: response cache disabled ({e})", file=sys.stderr)
+    compress_budget = args.compress_budget if args.compress else None
+
+    if not args.once:
+        if watcher.start_events():
+            print(f"Watching {args.folder} for changes...", file=sys.stderr)
+        else:
+            print(f"Polling {args.folder} every {args.interval:g}s (pip install watchdog for events)...",
+                  file=sys.stderr)
+
+    try:
+        run(watcher, backend, args.summary_model, args.interval, args.once, cache, compress_budget)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()